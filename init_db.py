@@ -4,15 +4,28 @@ Database initialization script for Computer Lab Scheduler
 This script creates sample data for testing the system.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from main import Base, Computer, Student, Booking, User, hash_password
+from models import Base, Computer, Student, Booking, User
+from security import hash_password
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import random
 
 # Database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./lab_scheduler.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+
+@event.listens_for(engine, "connect")
+def _init_connection(dbapi_connection, connection_record):
+    """Trade durability for speed while seeding; a failed run is simply re-run."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def create_sample_data():
@@ -24,11 +37,14 @@ def create_sample_data():
     db = SessionLocal()
     
     try:
-        # Check if data already exists
-        if db.query(User).count() > 0:
+        # Check if data already exists (SELECT ... LIMIT 1 stops at the first row)
+        if db.query(User.id).first() is not None:
             print("Sample data already exists. Skipping initialization.")
             return
         
+        # One timestamp for the whole seed
+        now = datetime.utcnow()
+        
         # Create sample users
         users_data = [
             {"username": "admin", "email": "admin@university.edu", "password": "admin123", "role": "admin"},
@@ -37,18 +53,24 @@ def create_sample_data():
             {"username": "jane_smith", "email": "jane.smith@university.edu", "password": "password123", "role": "student"},
         ]
         
-        users = []
-        for user_data in users_data:
-            user = User(
-                username=user_data["username"],
-                email=user_data["email"],
-                hashed_password=hash_password(user_data["password"]),
-                role=user_data["role"]
-            )
-            db.add(user)
-            users.append(user)
-        
-        db.commit()
+        # Hash each distinct demo password once; several users share one.
+        # The hashes are independent, so compute them in parallel.
+        passwords = list(dict.fromkeys(user_data["password"] for user_data in users_data))
+        with ThreadPoolExecutor(max_workers=len(passwords)) as executor:
+            password_hashes = dict(zip(passwords, executor.map(hash_password, passwords)))
+        
+        # Primary keys are assigned up front so dependent rows can reference them
+        # without reading the generated ids back from the database
+        users = [
+            {
+                "id": user_id,
+                "username": user_data["username"],
+                "email": user_data["email"],
+                "hashed_password": password_hashes[user_data["password"]],
+                "role": user_data["role"]
+            } for user_id, user_data in enumerate(users_data, start=1)
+        ]
+        db.bulk_insert_mappings(User, users)
         
         # Create 9 computers
         computer_names = [
@@ -56,22 +78,22 @@ def create_sample_data():
             "PC-06", "PC-07", "PC-08", "PC-09"
         ]
         
-        computers = []
-        for name in computer_names:
-            computer = Computer(
-                name=name,
-                status=random.choice(["available", "available", "available", "in_use"]),  # Mostly available
-                current_user=None,
-                last_updated=datetime.utcnow()
-            )
-            db.add(computer)
-            computers.append(computer)
+        computers = [
+            {
+                "id": computer_id,
+                "name": name,
+                "status": random.choice(["available", "available", "available", "in_use"]),  # Mostly available
+                "current_user": None,
+                "last_updated": now
+            } for computer_id, name in enumerate(computer_names, start=1)
+        ]
+        db.bulk_insert_mappings(Computer, computers)
         
         # Create sample students
         students_data = [
-            {"name": "Alice Johnson", "email": "alice.johnson@university.edu", "student_id": "STU001", "user_id": users[1].id},
-            {"name": "Bob Smith", "email": "bob.smith@university.edu", "student_id": "STU002", "user_id": users[2].id},
-            {"name": "Carol Davis", "email": "carol.davis@university.edu", "student_id": "STU003", "user_id": users[3].id},
+            {"name": "Alice Johnson", "email": "alice.johnson@university.edu", "student_id": "STU001", "user_id": users[1]["id"]},
+            {"name": "Bob Smith", "email": "bob.smith@university.edu", "student_id": "STU002", "user_id": users[2]["id"]},
+            {"name": "Carol Davis", "email": "carol.davis@university.edu", "student_id": "STU003", "user_id": users[3]["id"]},
             {"name": "David Wilson", "email": "david.wilson@university.edu", "student_id": "STU004"},
             {"name": "Eva Brown", "email": "eva.brown@university.edu", "student_id": "STU005"},
             {"name": "Frank Miller", "email": "frank.miller@university.edu", "student_id": "STU006"},
@@ -86,44 +108,53 @@ def create_sample_data():
             {"name": "Olivia White", "email": "olivia.white@university.edu", "student_id": "STU015"}
         ]
         
-        students = []
-        for student_data in students_data:
-            student = Student(**student_data)
-            db.add(student)
-            students.append(student)
-        
-        db.commit()
+        students = [
+            {"id": student_id, **student_data}
+            for student_id, student_data in enumerate(students_data, start=1)
+        ]
+        db.bulk_insert_mappings(Student, students)
         
         # Create some sample bookings
-        now = datetime.utcnow()
+        bookings = []
+        
+        # Draw the computer/student pair for all 5 + 2 + 8 bookings up front
+        booking_count = 15
+        computer_ids = [computer["id"] for computer in computers]
+        student_ids = [student["id"] for student in students]
+        booking_pairs = iter(zip(
+            random.choices(computer_ids, k=booking_count),
+            random.choices(student_ids, k=booking_count)
+        ))
         
         # Create bookings for today
         for i in range(5):
             start_time = now + timedelta(hours=i+1)
             end_time = start_time + timedelta(hours=1)
             
-            booking = Booking(
-                computer_id=random.choice(computers).id,
-                student_id=random.choice(students).id,
-                start_time=start_time,
-                end_time=end_time,
-                status="scheduled"
-            )
-            db.add(booking)
+            computer_id, student_id = next(booking_pairs)
+            
+            bookings.append({
+                "computer_id": computer_id,
+                "student_id": student_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "status": "scheduled"
+            })
         
         # Create some active bookings (currently in use)
         for i in range(2):
             start_time = now - timedelta(minutes=30)
             end_time = now + timedelta(minutes=30)
             
-            booking = Booking(
-                computer_id=random.choice(computers).id,
-                student_id=random.choice(students).id,
-                start_time=start_time,
-                end_time=end_time,
-                status="active"
-            )
-            db.add(booking)
+            computer_id, student_id = next(booking_pairs)
+            
+            bookings.append({
+                "computer_id": computer_id,
+                "student_id": student_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "status": "active"
+            })
         
         # Create bookings for tomorrow
         tomorrow = now + timedelta(days=1)
@@ -131,27 +162,36 @@ def create_sample_data():
             start_time = tomorrow + timedelta(hours=i+8)  # Starting from 8 AM
             end_time = start_time + timedelta(hours=1)
             
-            booking = Booking(
-                computer_id=random.choice(computers).id,
-                student_id=random.choice(students).id,
-                start_time=start_time,
-                end_time=end_time,
-                status="scheduled"
-            )
-            db.add(booking)
-        
-        db.commit()
+            computer_id, student_id = next(booking_pairs)
+            
+            bookings.append({
+                "computer_id": computer_id,
+                "student_id": student_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "status": "scheduled"
+            })
+        # Bookings have no dependants here, so a Core executemany is enough
+        db.execute(Booking.__table__.insert(), bookings)
         
         # Update some computers to show current users
-        active_bookings = db.query(Booking).filter(Booking.status == "active").all()
-        for booking in active_bookings:
-            computer = db.query(Computer).filter(Computer.id == booking.computer_id).first()
-            student = db.query(Student).filter(Student.id == booking.student_id).first()
-            if computer and student:
-                computer.status = "in_use"
-                computer.current_user = student.name
-                computer.last_updated = datetime.utcnow()
-        
+        active_bookings = (
+            db.query(Computer.id, Student.name)
+            .join(Booking, Booking.computer_id == Computer.id)
+            .join(Student, Student.id == Booking.student_id)
+            .filter(Booking.status == "active")
+            .all()
+        )
+        db.bulk_update_mappings(Computer, [
+            {
+                "id": computer_id,
+                "status": "in_use",
+                "current_user": student_name,
+                "last_updated": now
+            } for computer_id, student_name in active_bookings
+        ])
+        
+        # Everything above runs in one transaction; commit once at the end
         db.commit()
         
         print("✅ Sample data created successfully!")
@@ -1,47 +1,63 @@
-from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect, Request, status
+from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect, Request, BackgroundTasks, status
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, ForeignKey, func, text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship
-from pydantic import BaseModel
-from datetime import datetime, timedelta
-from typing import List, Optional
-import json
+from sqlalchemy import create_engine, event, text, and_, case, delete, func, insert, literal, select, update
+from sqlalchemy.orm import sessionmaker, Session
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, computed_field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from functools import lru_cache
+import asyncio
+import hashlib
+import orjson
+import time
 import uuid
+from pathlib import Path
 import secrets
 import string
-import random
-import pytz
-import hashlib
+import threading
 from sqlalchemy.exc import IntegrityError
+from models import Base, User, Computer, Student, Booking, ADDIS_ABABA_TZ, get_current_time
+from security import hash_password, verify_password, password_needs_rehash
 
 # Database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./lab_scheduler.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# Timezone setup
-ADDIS_ABABA_TZ = pytz.timezone('Africa/Addis_Ababa')
-
-def get_current_time():
-    """Get current time in Addis Ababa timezone"""
-    return datetime.now(ADDIS_ABABA_TZ)
-
+# Size the pool above the threadpool's 40 workers so concurrent sync handlers never wait on QueuePool
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=20,
+    max_overflow=40,
+)
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each pooled SQLite connection once, when it is first opened"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")  # readers no longer block on writers
+    cursor.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, no fsync per commit
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB memory-mapped I/O
+    cursor.close()
+
+# Committed objects keep their loaded state, so returning them after commit needs no re-SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Timezone helpers (ADDIS_ABABA_TZ and get_current_time live in models)
 def convert_to_utc(dt):
     """Convert datetime to UTC"""
     if dt.tzinfo is None:
         # Assume it's in Addis Ababa timezone if no timezone info
-        dt = ADDIS_ABABA_TZ.localize(dt)
-    return dt.astimezone(pytz.UTC)
+        dt = dt.replace(tzinfo=ADDIS_ABABA_TZ)
+    return dt.astimezone(timezone.utc)
 
 def convert_from_utc(dt):
     """Convert UTC datetime to Addis Ababa timezone"""
     if dt.tzinfo is None:
-        dt = pytz.UTC.localize(dt)
+        dt = dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(ADDIS_ABABA_TZ)
 
 def generate_username(name: str) -> str:
@@ -51,9 +67,8 @@ def generate_username(name: str) -> str:
     if len(clean_name) < 3:
         clean_name = clean_name + "user"
     
-    # Add random number to make it unique
-    random_num = random.randint(100, 999)
-    return f"{clean_name[:8]}{random_num}"
+    # Add a random 24-bit suffix; collisions are left to the unique index
+    return f"{clean_name[:8]}{secrets.token_hex(3)}"
 
 def generate_password(length: int = 8) -> str:
     """Generate a secure password"""
@@ -61,10 +76,8 @@ def generate_password(length: int = 8) -> str:
     return ''.join(secrets.choice(characters) for _ in range(length))
 
 def generate_student_id() -> str:
-    """Generate a unique student ID"""
-    year = datetime.now().year
-    random_num = random.randint(1000, 9999)
-    return f"STU{year}{random_num}"
+    """Generate a student ID; 6 random digits make collisions rare enough to leave to the unique index"""
+    return f"STU{datetime.now().year}{secrets.randbelow(1_000_000):06d}"
 
 # Week helpers for schedule view
 def get_monday(date_in_tz: datetime) -> datetime:
@@ -73,73 +86,27 @@ def get_monday(date_in_tz: datetime) -> datetime:
     return base - timedelta(days=weekday)
 
 def day_range_in_tz(target_date: datetime) -> (datetime, datetime):
-    start = target_date.replace(hour=9, minute=0, second=0, microsecond=0)
-    end = target_date.replace(hour=17, minute=0, second=0, microsecond=0)
+    """09:00-17:00 on target_date (a day in Addis Ababa time), as UTC"""
+    return _day_range_utc(target_date.year, target_date.month, target_date.day)
+
+def tomorrow_range() -> (datetime, datetime):
+    """Local midnight-to-midnight bounds of tomorrow in Addis Ababa time"""
+    midnight = get_current_time().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = midnight + timedelta(days=1)
+    return start, start + timedelta(days=1)
+
+@lru_cache(maxsize=64)
+def _day_range_utc(year: int, month: int, day: int) -> (datetime, datetime):
+    start = datetime(year, month, day, 9, tzinfo=ADDIS_ABABA_TZ)
+    end = datetime(year, month, day, 17, tzinfo=ADDIS_ABABA_TZ)
     # convert to UTC for storage
     return convert_to_utc(start), convert_to_utc(end)
 
-# Database Models
-class User(Base):
-    __tablename__ = "users"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String, unique=True, index=True)
-    email = Column(String, unique=True, index=True)
-    hashed_password = Column(String)
-    role = Column(String, default="student")  # admin, student
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=lambda: get_current_time())
-
-class Computer(Base):
-    __tablename__ = "computers"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, index=True)
-    status = Column(String, default="available")  # available, in_use, maintenance
-    current_user = Column(String, nullable=True)
-    last_updated = Column(DateTime, default=lambda: get_current_time())
-    
-    bookings = relationship("Booking", back_populates="computer")
-
-class Student(Base):
-    __tablename__ = "students"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
-    email = Column(String, unique=True, index=True)
-    student_id = Column(String, unique=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    # Optional metadata
-    study = Column(String, nullable=True)
-    department = Column(String, nullable=True)
-    registered_at = Column(DateTime, nullable=True)
-    active = Column(Boolean, default=True)
-    # Usage tracking
-    usage_days_total = Column(Integer, nullable=True)
-    usage_days_remaining = Column(Integer, nullable=True)
-    usage_last_decrement_at = Column(DateTime, nullable=True)
-    
-    bookings = relationship("Booking", back_populates="student")
-
-class Booking(Base):
-    __tablename__ = "bookings"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    computer_id = Column(Integer, ForeignKey("computers.id"))
-    student_id = Column(Integer, ForeignKey("students.id"))
-    start_time = Column(DateTime)
-    end_time = Column(DateTime)
-    status = Column(String, default="scheduled")  # scheduled, active, completed, cancelled
-    created_at = Column(DateTime, default=lambda: get_current_time())
-    
-    computer = relationship("Computer", back_populates="bookings")
-    student = relationship("Student", back_populates="bookings")
-
 # Create tables and ensure schema compatibility for legacy DBs
 Base.metadata.create_all(bind=engine)
 
 def ensure_students_columns():
-    """Ensure legacy SQLite DB has new columns used by the ORM model.
+    """Ensure legacy SQLite DB has new columns, indexes and normalized student keys used by the ORM model.
     SQLite doesn't auto-migrate existing tables on create_all.
     """
     with engine.connect() as conn:
@@ -160,9 +127,73 @@ def ensure_students_columns():
                 conn.execute(text("ALTER TABLE students ADD COLUMN usage_days_remaining INTEGER"))
             if "usage_last_decrement_at" not in columns:
                 conn.execute(text("ALTER TABLE students ADD COLUMN usage_last_decrement_at DATETIME"))
+            # Booking indexes added after the table was first created
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bookings_student_start ON bookings (student_id, start_time)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bookings_computer_status_time ON bookings (computer_id, status, start_time, end_time)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bookings_status_start ON bookings (status, start_time)"))
+            # Non-unique: legacy rows differing only by case would make a unique one fail to build
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_students_email_norm ON students (lower(trim(email)))"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_students_student_id_norm ON students (lower(trim(student_id)))"))
+            # Superseded by the two indexes above
+            conn.execute(text("DROP INDEX IF EXISTS ix_bookings_computer_start"))
+            conn.execute(text("DROP INDEX IF EXISTS ix_bookings_status"))
+            conn.commit()
         except Exception as e:
             # Do not crash app on migration best-effort issues
             print(f"Schema ensure failed: {e}")
+        try:
+            # Keep email/student_id trimmed and lowercased on every write.
+            # SQLite can't assign NEW in a BEFORE trigger, so fix up the row right after it is written
+            conn.execute(text("""
+                CREATE TRIGGER IF NOT EXISTS students_normalize_insert AFTER INSERT ON students
+                BEGIN
+                    UPDATE students SET email = lower(trim(NEW.email)), student_id = lower(trim(NEW.student_id))
+                    WHERE id = NEW.id AND (email <> lower(trim(NEW.email)) OR student_id <> lower(trim(NEW.student_id)));
+                END
+            """))
+            conn.execute(text("""
+                CREATE TRIGGER IF NOT EXISTS students_normalize_update AFTER UPDATE OF email, student_id ON students
+                BEGIN
+                    UPDATE students SET email = lower(trim(NEW.email)), student_id = lower(trim(NEW.student_id))
+                    WHERE id = NEW.id AND (email <> lower(trim(NEW.email)) OR student_id <> lower(trim(NEW.student_id)));
+                END
+            """))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Student normalization triggers failed: {e}")
+        for column in ("email", "student_id"):
+            try:
+                normalize_student_column(conn, column)
+            except Exception as e:
+                conn.rollback()
+                print(f"Student {column} normalization failed: {e}")
+
+def normalize_student_column(conn, column: str):
+    """Backfill lower(trim()) for one legacy column, skipping rows whose normalized value is taken"""
+    pending = conn.execute(text(
+        f"SELECT id, {column} FROM students WHERE {column} <> lower(trim({column})) ORDER BY id"
+    )).fetchall()
+    skipped = []
+    for row_id, value in pending:
+        # One row at a time so each check sees the rows already rewritten; the savepoint covers
+        # the update trigger, which also normalizes the row's other column and can collide there
+        savepoint = conn.begin_nested()
+        try:
+            updated = conn.execute(text(
+                f"UPDATE students SET {column} = lower(trim({column})) WHERE id = :id AND NOT EXISTS ("
+                f"SELECT 1 FROM students s2 WHERE s2.{column} = lower(trim(students.{column})) AND s2.id <> students.id)"
+            ), {"id": row_id}).rowcount
+            savepoint.commit()
+        except IntegrityError:
+            savepoint.rollback()
+            updated = 0
+        if not updated:
+            skipped.append((row_id, value))
+    conn.commit()
+    if skipped:
+        # e.g. two legacy rows that only differ by case; leave them for an admin to resolve
+        print(f"Student {column} left unnormalized (collides with another row): {skipped}")
 
 ensure_students_columns()
 
@@ -177,16 +208,59 @@ def get_db():
 # Authentication
 security = HTTPBasic()
 
-def hash_password(password: str) -> str:
-    """Hash a password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return hash_password(plain_password) == hashed_password
+# Verified credentials are remembered briefly so repeat requests skip the DB lookup and Argon2
+AUTH_CACHE_TTL_SECONDS = 30
+AUTH_CACHE_MAX_ENTRIES = 1024
+_AUTH_CACHE_PEPPER = secrets.token_bytes(32)
+_auth_cache: Dict[bytes, Tuple[float, User]] = {}
+# Handlers run in the threadpool, so every read and write of _auth_cache goes through this lock
+_auth_cache_lock = threading.Lock()
+
+def _auth_cache_key(username: str, password: str) -> bytes:
+    data = f"{username}:{password}".encode()
+    return hashlib.blake2b(data, key=_AUTH_CACHE_PEPPER, digest_size=16).digest()
+
+def _cached_login(cache_key: bytes) -> Optional[User]:
+    with _auth_cache_lock:
+        cached = _auth_cache.get(cache_key)
+        if cached:
+            if time.monotonic() - cached[0] < AUTH_CACHE_TTL_SECONDS:
+                return cached[1]
+            _auth_cache.pop(cache_key, None)
+    return None
+
+def _remember_login(cache_key: bytes, user: User):
+    """Cache an active, verified user as a detached copy (readable after the request's session closes)"""
+    snapshot = User(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        hashed_password=user.hashed_password,
+        role=user.role,
+        is_active=user.is_active,
+        created_at=user.created_at,
+    )
+    with _auth_cache_lock:
+        now = time.monotonic()
+        if len(_auth_cache) >= AUTH_CACHE_MAX_ENTRIES:
+            # Drop expired logins first, then the oldest ones (dicts keep insertion order)
+            for key in [k for k, (ts, _) in _auth_cache.items() if now - ts >= AUTH_CACHE_TTL_SECONDS]:
+                del _auth_cache[key]
+            while _auth_cache and len(_auth_cache) >= AUTH_CACHE_MAX_ENTRIES:
+                del _auth_cache[next(iter(_auth_cache))]
+        _auth_cache[cache_key] = (now, snapshot)
+
+def invalidate_auth_cache():
+    """Forget all cached logins (call after changing or removing users)"""
+    with _auth_cache_lock:
+        _auth_cache.clear()
 
 def get_current_user(credentials: HTTPBasicCredentials = Depends(security), db: Session = Depends(get_db)):
     """Get current authenticated user"""
+    cache_key = _auth_cache_key(credentials.username, credentials.password)
+    cached = _cached_login(cache_key)
+    if cached:
+        return cached
     user = db.query(User).filter(User.username == credentials.username).first()
     if not user or not verify_password(credentials.password, user.hashed_password):
         raise HTTPException(
@@ -196,6 +270,11 @@ def get_current_user(credentials: HTTPBasicCredentials = Depends(security), db:
         )
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    # Upgrade legacy SHA-256 (or outdated Argon2) hashes on successful login
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = hash_password(credentials.password)
+        db.commit()
+    _remember_login(cache_key, user)
     return user
 
 def get_admin_user(current_user: User = Depends(get_current_user)):
@@ -236,8 +315,7 @@ class UserCreateResponse(BaseModel):
     role: str
     student_id: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserResponse(BaseModel):
     id: int
@@ -247,8 +325,7 @@ class UserResponse(BaseModel):
     is_active: bool
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserLogin(BaseModel):
     username: str
@@ -264,8 +341,7 @@ class ComputerResponse(BaseModel):
     current_user: Optional[str]
     last_updated: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class StudentCreate(BaseModel):
     name: str
@@ -288,8 +364,34 @@ class StudentResponse(BaseModel):
     usage_days_total: Optional[int] = None
     usage_days_remaining: Optional[int] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class StudentSummary(BaseModel):
+    id: int
+    # Nullable columns; the summary reports them as null rather than failing
+    name: Optional[str] = None
+    email: Optional[str] = None
+    study: Optional[str] = None
+    department: Optional[str] = None
+    is_active: Optional[bool] = None
+    usage_days_total: Optional[int] = None
+    usage_days_remaining: Optional[int] = None
+    # Inputs for `date`, not sent to the client
+    user_created_at: Optional[datetime] = Field(default=None, exclude=True)
+    registered_at: Optional[datetime] = Field(default=None, exclude=True)
+    
+    model_config = ConfigDict(from_attributes=True)
+    
+    @computed_field
+    @property
+    def date(self) -> Optional[datetime]:
+        # derive date from linked user if exists, else fall back to student's registered_at
+        if self.user_created_at:
+            created = self.user_created_at
+            return convert_from_utc(created) if created.tzinfo is None else created
+        return self.registered_at
+
+student_summaries = TypeAdapter(List[StudentSummary])
 
 class BookingCreate(BaseModel):
     computer_id: int
@@ -312,66 +414,126 @@ class BookingResponse(BaseModel):
     status: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ComputerStatusUpdate(BaseModel):
     computer_id: int
     status: str
     current_user: Optional[str] = None
 
+# Plain-dict serializers for endpoints that return ORJSONResponse directly,
+# skipping FastAPI's jsonable_encoder and response_model validation
+def computer_to_dict(computer: Computer) -> dict:
+    return {
+        "id": computer.id,
+        "name": computer.name,
+        "status": computer.status,
+        "current_user": computer.current_user,
+        "last_updated": computer.last_updated
+    }
+
+def student_to_dict(student: Student) -> dict:
+    return {
+        "id": student.id,
+        "name": student.name,
+        "email": student.email,
+        "student_id": student.student_id,
+        "study": student.study,
+        "department": student.department,
+        "date": student.registered_at,
+        "active": student.active,
+        "usage_days_total": student.usage_days_total,
+        "usage_days_remaining": student.usage_days_remaining
+    }
+
+def booking_to_dict(booking: Booking) -> dict:
+    return {
+        "id": booking.id,
+        "computer_id": booking.computer_id,
+        "student_id": booking.student_id,
+        "start_time": booking.start_time,
+        "end_time": booking.end_time,
+        "status": booking.status,
+        "created_at": booking.created_at
+    }
+
+def etag_json_response(request: Request, content, untagged: Optional[dict] = None) -> Response:
+    """JSON response tagged with a hash of its content; 304 if the client has it.
+    Keys in `untagged` (e.g. a timestamp) are merged into the content, which must then be a dict,
+    without affecting the tag.
+    """
+    body = orjson.dumps(content)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    # no-cache: clients may keep the body but must revalidate it on every poll
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    if untagged:
+        if isinstance(content, dict) and content:
+            # Splice the extra keys into the already-encoded object instead of encoding it again
+            body = body[:-1] + b"," + orjson.dumps(untagged)[1:]
+        else:
+            # "{}" has no comma to splice after; anything but a dict fails here with a TypeError
+            body = orjson.dumps({**content, **untagged})
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # FastAPI app
-app = FastAPI(title="Computer Lab Scheduler", version="1.0.0")
+app = FastAPI(title="Computer Lab Scheduler", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Mount static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# Static HTML pages are read once at startup instead of on every request
+INDEX_HTML = Path("templates/index.html").read_bytes()
+ADMIN_HTML = Path("templates/admin.html").read_bytes()
+STUDENT_HTML = Path("templates/student.html").read_bytes()
+REGISTER_HTML = Path("templates/register.html").read_bytes()
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                pass
+        self.active_connections.discard(websocket)
+
+    async def broadcast(self, message: dict):
+        # Serialize once and send the same bytes as binary frames (the clients decode them as UTF-8 JSON)
+        payload = orjson.dumps(message)
+        # Send to everyone concurrently and drop sockets whose send failed
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_bytes(payload) for connection in connections),
+            return_exceptions=True,
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.active_connections.discard(connection)
 
 manager = ConnectionManager()
 
 # API Endpoints
 @app.get("/", response_class=HTMLResponse)
 def read_root():
-    with open("templates/index.html", "r") as f:
-        html_content = f.read()
-    return HTMLResponse(content=html_content)
+    return HTMLResponse(content=INDEX_HTML)
 
 @app.get("/admin", response_class=HTMLResponse)
 def admin_dashboard():
-    with open("templates/admin.html", "r") as f:
-        html_content = f.read()
-    return HTMLResponse(content=html_content)
+    return HTMLResponse(content=ADMIN_HTML)
 
 @app.get("/student", response_class=HTMLResponse)
 def student_dashboard():
-    with open("templates/student.html", "r") as f:
-        html_content = f.read()
-    return HTMLResponse(content=html_content)
+    return HTMLResponse(content=STUDENT_HTML)
 
 @app.get("/register", response_class=HTMLResponse)
 def register_page():
-    with open("templates/register.html", "r") as f:
-        html_content = f.read()
-    return HTMLResponse(content=html_content)
+    return HTMLResponse(content=REGISTER_HTML)
 
 # Authentication endpoints
 @app.post("/api/auth/register", response_model=UserResponse)
@@ -393,7 +555,6 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 @app.get("/api/auth/me", response_model=UserResponse)
@@ -401,21 +562,20 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
 # Admin-only endpoints
-@app.get("/api/admin/computers", response_model=List[ComputerResponse])
+@app.get("/api/admin/computers")
 def get_computers_admin(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return db.query(Computer).all()
+    return ORJSONResponse([computer_to_dict(c) for c in db.query(Computer).all()])
 
 @app.post("/api/admin/computers", response_model=ComputerResponse)
 def create_computer_admin(computer: ComputerCreate, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
     db_computer = Computer(name=computer.name)
     db.add(db_computer)
     db.commit()
-    db.refresh(db_computer)
     return db_computer
 
-@app.get("/api/admin/students", response_model=List[StudentResponse])
+@app.get("/api/admin/students")
 def get_students_admin(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return db.query(Student).all()
+    return ORJSONResponse([student_to_dict(s) for s in db.query(Student).all()])
 
 @app.post("/api/admin/students", response_model=StudentResponse)
 def create_student_admin(student: StudentCreate, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
@@ -426,7 +586,7 @@ def create_student_admin(student: StudentCreate, current_user: User = Depends(ge
             # accept YYYY-MM-DD or ISO
             if len(student.date) == 10:
                 y, m, d = map(int, student.date.split("-"))
-                reg_at = ADDIS_ABABA_TZ.localize(datetime(y, m, d))
+                reg_at = datetime(y, m, d, tzinfo=ADDIS_ABABA_TZ)
             else:
                 reg_at = datetime.fromisoformat(student.date)
         except Exception:
@@ -434,17 +594,21 @@ def create_student_admin(student: StudentCreate, current_user: User = Depends(ge
     # Normalize inputs and check duplicates before insert
     sid = (student.student_id or "").strip().lower()
     email = (student.email or "").strip().lower()
+    # Legacy rows the backfill had to skip may still be mixed-case, so match on lower(trim())
+    # (served by the ix_students_*_norm expression indexes)
     dup = db.query(Student).filter(
         (func.lower(func.trim(Student.student_id)) == sid) | (func.lower(func.trim(Student.email)) == email)
     ).first()
     if dup:
         # Build a specific message
         detail = "Duplicate student"
-        if dup.student_id == sid and dup.email == email:
+        dup_sid = (dup.student_id or "").strip().lower()
+        dup_email = (dup.email or "").strip().lower()
+        if dup_sid == sid and dup_email == email:
             detail = "Student ID and email already exist"
-        elif dup.student_id == sid:
+        elif dup_sid == sid:
             detail = "Student ID already exists"
-        elif dup.email == email:
+        elif dup_email == email:
             detail = "Email already exists"
         raise HTTPException(status_code=409, detail=detail)
     db_student = Student(
@@ -460,7 +624,6 @@ def create_student_admin(student: StudentCreate, current_user: User = Depends(ge
     try:
         db.add(db_student)
         db.commit()
-        db.refresh(db_student)
         return db_student
     except IntegrityError as e:
         db.rollback()
@@ -474,13 +637,6 @@ def create_user_simple(user: UserCreateSimple, current_user: User = Depends(get_
         username = generate_username(user.name)
         password = generate_password()
         
-        # Ensure username is unique
-        counter = 1
-        original_username = username
-        while db.query(User).filter(User.username == username).first():
-            username = f"{original_username}{counter}"
-            counter += 1
-        
         # Create user
         hashed_password = hash_password(password)
         db_user = User(
@@ -490,8 +646,15 @@ def create_user_simple(user: UserCreateSimple, current_user: User = Depends(get_
             role="admin"
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Username suffix clash (or duplicate email): retry once with a fresh username
+            db.rollback()
+            username = generate_username(user.name)
+            db_user.username = username
+            db.add(db_user)
+            db.commit()
         
         # No automatic student record creation anymore; admin-only system
         student_id = None
@@ -508,62 +671,67 @@ def create_user_simple(user: UserCreateSimple, current_user: User = Depends(get_
         print(f"Error creating user: {e}")
         raise HTTPException(status_code=500, detail=f"Error creating user: {str(e)}")
 
-@app.get("/api/admin/bookings", response_model=List[BookingResponse])
+@app.get("/api/admin/bookings")
 def get_all_bookings_admin(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return db.query(Booking).order_by(Booking.start_time.desc()).all()
+    bookings = db.query(Booking).order_by(Booking.start_time.desc()).all()
+    return ORJSONResponse([booking_to_dict(b) for b in bookings])
 
-@app.get("/api/admin/bookings/tomorrow", response_model=List[BookingResponse])
+@app.get("/api/admin/bookings/tomorrow")
 def get_tomorrow_bookings_admin(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    tomorrow_start = get_current_time().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-    tomorrow_end = tomorrow_start + timedelta(days=1)
+    tomorrow_start, tomorrow_end = tomorrow_range()
     
-    return db.query(Booking).filter(
+    bookings = db.query(Booking).filter(
         Booking.start_time >= tomorrow_start,
         Booking.start_time < tomorrow_end
     ).order_by(Booking.start_time).all()
+    return ORJSONResponse([booking_to_dict(b) for b in bookings])
 
 @app.get("/api/admin/users/status")
 def get_users_status_admin(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
     """Get all users with their booking status for tomorrow"""
-    tomorrow_start = get_current_time().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-    tomorrow_end = tomorrow_start + timedelta(days=1)
+    tomorrow_start, tomorrow_end = tomorrow_range()
     
-    users = db.query(User).all()
-    users_status = []
+    # One outer-joined query instead of two lookups per user
+    rows = db.query(User, Student, Booking).outerjoin(
+        Student, Student.user_id == User.id
+    ).outerjoin(
+        Booking,
+        and_(
+            Booking.student_id == Student.id,
+            Booking.start_time >= tomorrow_start,
+            Booking.start_time < tomorrow_end
+        )
+    ).order_by(User.id, Student.id, Booking.id).all()
     
-    for user in users:
-        # Get student record
-        student = db.query(Student).filter(Student.user_id == user.id).first()
-        
-        # Check if user has bookings tomorrow
-        tomorrow_bookings = []
-        if student:
-            tomorrow_bookings = db.query(Booking).filter(
-                Booking.student_id == student.id,
-                Booking.start_time >= tomorrow_start,
-                Booking.start_time < tomorrow_end
-            ).all()
-        
-        users_status.append({
-            "user_id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "role": user.role,
-            "student_name": student.name if student else None,
-            "student_id": student.student_id if student else None,
-            "has_tomorrow_booking": len(tomorrow_bookings) > 0,
-            "tomorrow_bookings": [
-                {
-                    "id": booking.id,
-                    "computer_id": booking.computer_id,
-                    "start_time": booking.start_time.isoformat(),
-                    "end_time": booking.end_time.isoformat(),
-                    "status": booking.status
-                } for booking in tomorrow_bookings
-            ]
+    users_status = {}
+    linked_student_ids = {}
+    for user, student, booking in rows:
+        if user.id not in users_status:
+            # Only a user's first student record is reported
+            linked_student_ids[user.id] = student.id if student else None
+            users_status[user.id] = {
+                "user_id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "role": user.role,
+                "student_name": student.name if student else None,
+                "student_id": student.student_id if student else None,
+                "has_tomorrow_booking": False,
+                "tomorrow_bookings": []
+            }
+        if booking is None or booking.student_id != linked_student_ids[user.id]:
+            continue
+        entry = users_status[user.id]
+        entry["has_tomorrow_booking"] = True
+        entry["tomorrow_bookings"].append({
+            "id": booking.id,
+            "computer_id": booking.computer_id,
+            "start_time": booking.start_time.isoformat(),
+            "end_time": booking.end_time.isoformat(),
+            "status": booking.status
         })
     
-    return users_status
+    return ORJSONResponse(list(users_status.values()))
 
 # Weekly schedule endpoints (Mon–Fri simple grid)
 @app.get("/api/admin/schedule/week")
@@ -575,17 +743,31 @@ def get_week_schedule(current_user: User = Depends(get_admin_user), db: Session
     students = db.query(Student).order_by(Student.name.asc()).all()
     computers = db.query(Computer).order_by(Computer.name.asc()).all()
 
+    # One query for the whole week, bucketed per (student, day) in Python.
+    # Stored times are naive UTC, so compare against naive UTC windows.
+    day_windows = [
+        tuple(dt.replace(tzinfo=None) for dt in day_range_in_tz(d)) for d in days
+    ]
+    bookings = db.query(
+        Booking.id, Booking.student_id, Booking.computer_id, Booking.start_time, Booking.end_time
+    ).filter(
+        Booking.start_time <= day_windows[-1][1],
+        Booking.end_time >= day_windows[0][0],
+        Booking.status.in_(["scheduled", "active"])
+    ).order_by(Booking.start_time.asc(), Booking.id.asc()).all()
+    
+    # Earliest booking overlapping each student's day
+    by_student_day = {}
+    for booking in bookings:
+        for i, (start_utc, end_utc) in enumerate(day_windows):
+            if booking.start_time <= end_utc and booking.end_time >= start_utc:
+                by_student_day.setdefault((booking.student_id, i), booking)
+    
     schedule = []
     for student in students:
         row = {"student_id": student.id, "student_name": student.name, "days": []}
-        for d in days:
-            start_utc, end_utc = day_range_in_tz(d)
-            booking = db.query(Booking).filter(
-                Booking.student_id == student.id,
-                Booking.start_time <= end_utc,
-                Booking.end_time >= start_utc,
-                Booking.status.in_(["scheduled", "active"]) 
-            ).order_by(Booking.start_time.asc()).first()
+        for i, d in enumerate(days):
+            booking = by_student_day.get((student.id, i))
             if booking:
                 row["days"].append({
                     "date": d.date().isoformat(),
@@ -602,13 +784,13 @@ def get_week_schedule(current_user: User = Depends(get_admin_user), db: Session
                 })
         schedule.append(row)
 
-    return {
+    return ORJSONResponse({
         "week_start": days[0].date().isoformat(),
         "week_end": days[-1].date().isoformat(),
         "days": [d.strftime("%A") for d in days],
         "computers": [{"id": c.id, "name": c.name} for c in computers],
         "rows": schedule
-    }
+    })
 
 class ToggleDayPayload(BaseModel):
     student_id: int
@@ -620,7 +802,7 @@ def toggle_day_booking(payload: ToggleDayPayload, current_user: User = Depends(g
     # Parse date in Addis Ababa timezone
     try:
         year, month, day = map(int, payload.date.split("-"))
-        local_date = ADDIS_ABABA_TZ.localize(datetime(year, month, day))
+        local_date = datetime(year, month, day, tzinfo=ADDIS_ABABA_TZ)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid date format")
 
@@ -644,13 +826,13 @@ def toggle_day_booking(payload: ToggleDayPayload, current_user: User = Depends(g
     if not payload.computer_id:
         raise HTTPException(status_code=400, detail="computer_id required to add booking")
 
-    # Ensure computer availability that day
-    conflict = db.query(Booking).filter(
+    # Ensure computer availability that day (EXISTS stops at the first match)
+    conflict = db.query(db.query(Booking).filter(
         Booking.computer_id == payload.computer_id,
         Booking.start_time < end_utc,
         Booking.end_time > start_utc,
         Booking.status.in_(["scheduled", "active"]) 
-    ).count()
+    ).exists()).scalar()
     if conflict:
         raise HTTPException(status_code=400, detail="Computer not available for selected day")
 
@@ -664,7 +846,6 @@ def toggle_day_booking(payload: ToggleDayPayload, current_user: User = Depends(g
     )
     db.add(db_booking)
     db.commit()
-    db.refresh(db_booking)
     return {"toggled": "added", "booking_id": db_booking.id}
 
 # Admin direct assign/unassign to computers (simple immediate use)
@@ -735,19 +916,12 @@ def delete_computer_admin(computer_id: int, current_user: User = Depends(get_adm
     computer = db.query(Computer).filter(Computer.id == computer_id).first()
     if not computer:
         raise HTTPException(status_code=404, detail="Computer not found")
-    # Delete related bookings to satisfy FK constraints
-    related_bookings = db.query(Booking).filter(Booking.computer_id == computer_id).all()
-    for b in related_bookings:
-        db.delete(b)
+    # Delete related bookings to satisfy FK constraints (single DELETE, no row loading)
+    db.query(Booking).filter(Booking.computer_id == computer_id).delete(synchronize_session=False)
     db.delete(computer)
     db.commit()
     return {"deleted": True}
 
-# Trailing slash variant
-@app.delete("/api/admin/computers/{computer_id}/")
-def delete_computer_admin_slash(computer_id: int, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return delete_computer_admin(computer_id, current_user, db)
-
 class ComputerDeletePayload(BaseModel):
     computer_id: int
 
@@ -755,31 +929,21 @@ class ComputerDeletePayload(BaseModel):
 def delete_computer_admin_post(payload: ComputerDeletePayload, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
     return delete_computer_admin(payload.computer_id, current_user, db)
 
-@app.post("/api/admin/computers/delete/")
-def delete_computer_admin_post_slash(payload: ComputerDeletePayload, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return delete_computer_admin(payload.computer_id, current_user, db)
-
 # Delete user (and linked student + bookings)
 @app.delete("/api/admin/users/{user_id}")
 def delete_user_admin(user_id: int, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    student = db.query(Student).filter(Student.user_id == user_id).first()
-    if student:
-        # Delete student's bookings
-        student_bookings = db.query(Booking).filter(Booking.student_id == student.id).all()
-        for b in student_bookings:
-            db.delete(b)
-        db.delete(student)
+    # Delete linked students' bookings, then the students, in one statement each
+    student_ids = db.query(Student.id).filter(Student.user_id == user_id).scalar_subquery()
+    db.query(Booking).filter(Booking.student_id.in_(student_ids)).delete(synchronize_session=False)
+    db.query(Student).filter(Student.user_id == user_id).delete(synchronize_session=False)
     db.delete(user)
     db.commit()
+    invalidate_auth_cache()
     return {"deleted": True}
 
-@app.delete("/api/admin/users/{user_id}/")
-def delete_user_admin_slash(user_id: int, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return delete_user_admin(user_id, current_user, db)
-
 class UserDeletePayload(BaseModel):
     user_id: int
 
@@ -787,63 +951,55 @@ class UserDeletePayload(BaseModel):
 def delete_user_admin_post(payload: UserDeletePayload, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
     return delete_user_admin(payload.user_id, current_user, db)
 
-@app.post("/api/admin/users/delete/")
-def delete_user_admin_post_slash(payload: UserDeletePayload, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return delete_user_admin(payload.user_id, current_user, db)
+# Trailing slash variants reuse the handlers above
+for path, endpoint, method in (
+    ("/api/admin/computers/{computer_id}/", delete_computer_admin, "DELETE"),
+    ("/api/admin/computers/delete/", delete_computer_admin_post, "POST"),
+    ("/api/admin/users/{user_id}/", delete_user_admin, "DELETE"),
+    ("/api/admin/users/delete/", delete_user_admin_post, "POST"),
+):
+    app.add_api_route(path, endpoint, methods=[method], include_in_schema=False)
 
 # Students summary for admin table
 @app.get("/api/admin/students/summary")
-def get_students_summary(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    students = db.query(Student).order_by(Student.name.asc()).all()
-    summary = []
-    for s in students:
-        # derive date from linked user if exists
-        created = None
-        # Default to student's own active flag; override with linked user's is_active when present
-        is_active = s.active
-        if s.user_id:
-            u = db.query(User).filter(User.id == s.user_id).first()
-            if u and u.created_at:
-                created = convert_from_utc(u.created_at) if u.created_at.tzinfo is None else u.created_at
-            if u is not None:
-                is_active = u.is_active
-        # fallback to student's registered_at for created date if still missing
-        if not created and s.registered_at:
-            created = s.registered_at
-        summary.append({
-            "id": s.id,
-            "name": s.name,
-            "email": s.email,
-            "study": s.study,
-            "department": s.department,
-            "date": created.isoformat() if created else None,
-            "is_active": is_active,
-            "usage_days_total": s.usage_days_total,
-            "usage_days_remaining": s.usage_days_remaining
-        })
-    return summary
+def get_students_summary(request: Request, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+    # Linked users come back in the same query instead of one lookup per student;
+    # a linked user's is_active overrides the student's own active flag
+    rows = db.query(
+        Student.id, Student.name, Student.email, Student.study, Student.department,
+        Student.registered_at, Student.usage_days_total, Student.usage_days_remaining,
+        case((User.id.is_not(None), User.is_active), else_=Student.active).label("is_active"),
+        User.created_at.label("user_created_at"),
+    ).outerjoin(User, User.id == Student.user_id).order_by(Student.name.asc()).all()
+    # pydantic-core reads the rows and builds the response dicts
+    summary = student_summaries.dump_python(student_summaries.validate_python(rows, from_attributes=True))
+    # orjson writes the datetimes as ISO 8601 itself
+    return etag_json_response(request, summary)
 
 @app.post("/api/admin/students/{student_id}/toggle-active")
 def toggle_student_active(student_id: int, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-    # Prefer toggling linked user if present, else toggle student.active flag
-    if student.user_id:
-        user = db.query(User).filter(User.id == student.user_id).first()
-        if user:
-            user.is_active = not bool(user.is_active)
-            db.commit()
-            return {"student_id": student_id, "user_id": user.id, "is_active": user.is_active}
+    # Prefer toggling linked user if present, else toggle student.active flag (flipped in SQL, NULL counts as inactive).
+    # The linked user is found by a subquery, so the common case is a single UPDATE with no prior SELECT.
+    linked_user_id = db.query(Student.user_id).filter(Student.id == student_id).scalar_subquery()
+    toggled_user = db.execute(
+        update(User).where(User.id == linked_user_id)
+        .values(is_active=case((User.is_active.is_(True), False), else_=True))
+        .returning(User.id, User.is_active)
+    ).first()
+    if toggled_user is not None:
+        db.commit()
+        invalidate_auth_cache()
+        return {"student_id": student_id, "user_id": toggled_user.id, "is_active": toggled_user.is_active}
     # Fallback: toggle student's active flag
-    student.active = not bool(student.active)
+    toggled_student = db.execute(
+        update(Student).where(Student.id == student_id)
+        .values(active=case((Student.active.is_(True), False), else_=True))
+        .returning(Student.active)
+    ).first()
+    if toggled_student is None:
+        raise HTTPException(status_code=404, detail="Student not found")
     db.commit()
-    return {"student_id": student_id, "user_id": None, "is_active": student.active}
-
-# Trailing slash variant
-@app.post("/api/admin/students/{student_id}/toggle-active/")
-def toggle_student_active_slash(student_id: int, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return toggle_student_active(student_id, current_user, db)
+    return {"student_id": student_id, "user_id": None, "is_active": toggled_student.active}
 
 class StudentTogglePayload(BaseModel):
     student_id: int
@@ -858,37 +1014,34 @@ class StudentUsageUpdate(BaseModel):
 
 @app.post("/api/admin/students/{student_id}/usage")
 def update_student_usage(student_id: int, payload: StudentUsageUpdate, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
     if payload.days == 0:
+        student = db.query(Student.usage_days_total, Student.usage_days_remaining).filter(Student.id == student_id).first()
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
         return {
             "student_id": student_id,
             "usage_days_total": student.usage_days_total,
             "usage_days_remaining": student.usage_days_remaining,
         }
-    # Initialize totals if not set
-    if student.usage_days_total is None:
-        student.usage_days_total = 0
-    if student.usage_days_remaining is None:
-        student.usage_days_remaining = 0
-    student.usage_days_total = max(0, student.usage_days_total + payload.days)
-    student.usage_days_remaining = max(0, student.usage_days_remaining + payload.days)
-    # If days become positive, mark active
-    if student.usage_days_remaining > 0:
-        student.active = True
+    # Adjust both counters in one UPDATE (unset counts start from 0, results clamp at 0)
+    remaining = func.max(0, func.coalesce(Student.usage_days_remaining, 0) + payload.days)
+    updated = db.execute(
+        update(Student).where(Student.id == student_id).values(
+            usage_days_total=func.max(0, func.coalesce(Student.usage_days_total, 0) + payload.days),
+            usage_days_remaining=remaining,
+            # If days become positive, mark active
+            active=case((remaining > 0, True), else_=Student.active),
+        ).returning(Student.usage_days_total, Student.usage_days_remaining)
+    ).first()
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Student not found")
     db.commit()
     return {
         "student_id": student_id,
-        "usage_days_total": student.usage_days_total,
-        "usage_days_remaining": student.usage_days_remaining,
+        "usage_days_total": updated.usage_days_total,
+        "usage_days_remaining": updated.usage_days_remaining,
     }
 
-# Trailing slash variant
-@app.post("/api/admin/students/{student_id}/usage/")
-def update_student_usage_slash(student_id: int, payload: StudentUsageUpdate, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return update_student_usage(student_id, payload, current_user, db)
-
 class StudentUsageUpdateBody(BaseModel):
     student_id: int
     days: int
@@ -897,34 +1050,33 @@ class StudentUsageUpdateBody(BaseModel):
 def update_student_usage_body(payload: StudentUsageUpdateBody, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
     return update_student_usage(payload.student_id, StudentUsageUpdate(days=payload.days), current_user, db)
 
-@app.post("/api/admin/students/usage/")
-def update_student_usage_body_slash(payload: StudentUsageUpdateBody, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return update_student_usage(payload.student_id, StudentUsageUpdate(days=payload.days), current_user, db)
-
-@app.post("/api/admin/students/toggle-active/")
-def toggle_student_active_body_slash(payload: StudentTogglePayload, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    return toggle_student_active(payload.student_id, current_user, db)
+# Trailing slash variants reuse the handlers above
+for path, endpoint in (
+    ("/api/admin/students/{student_id}/toggle-active/", toggle_student_active),
+    ("/api/admin/students/toggle-active/", toggle_student_active_body),
+    ("/api/admin/students/{student_id}/usage/", update_student_usage),
+    ("/api/admin/students/usage/", update_student_usage_body),
+):
+    app.add_api_route(path, endpoint, methods=["POST"], include_in_schema=False)
 
 @app.delete("/api/admin/students/{student_id}")
 def delete_student_admin(student_id: int, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
+    # Bulk DELETEs: bookings first, then the student (handing back its linked user), then that user
+    db.query(Booking).filter(Booking.student_id == student_id).delete(synchronize_session=False)
+    deleted = db.execute(
+        delete(Student).where(Student.id == student_id).returning(Student.user_id)
+    ).first()
+    if deleted is None:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Student not found")
-    # delete student's bookings
-    bookings = db.query(Booking).filter(Booking.student_id == student.id).all()
-    for b in bookings:
-        db.delete(b)
-    # delete linked user if present
-    if student.user_id:
-        user = db.query(User).filter(User.id == student.user_id).first()
-        if user:
-            db.delete(user)
-    db.delete(student)
+    if deleted.user_id:
+        db.query(User).filter(User.id == deleted.user_id).delete(synchronize_session=False)
     db.commit()
+    invalidate_auth_cache()
     return {"deleted": True}
 
 @app.put("/api/admin/computers/{computer_id}/status")
-def update_computer_status_admin(computer_id: int, status_update: ComputerStatusUpdate, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def update_computer_status_admin(computer_id: int, status_update: ComputerStatusUpdate, background_tasks: BackgroundTasks, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
     computer = db.query(Computer).filter(Computer.id == computer_id).first()
     if not computer:
         raise HTTPException(status_code=404, detail="Computer not found")
@@ -947,59 +1099,50 @@ def update_computer_status_admin(computer_id: int, status_update: ComputerStatus
     
     db.commit()
     
-    # Broadcast update to all connected clients
-    import asyncio
-    import threading
-    
-    def broadcast_message():
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(manager.broadcast(json.dumps({
-                "type": "computer_status_update",
-                "computer_id": computer_id,
-                "status": status_update.status,
-                "current_user": status_update.current_user,
-                "timestamp": get_current_time().isoformat()
-            })))
-            loop.close()
-        except Exception as e:
-            print(f"Error broadcasting message: {e}")
-    
-    # Run broadcast in a separate thread
-    threading.Thread(target=broadcast_message, daemon=True).start()
+    # Broadcast update to all connected clients on the app's event loop once the response is sent
+    background_tasks.add_task(manager.broadcast, {
+        "type": "computer_status_update",
+        "computer_id": computer_id,
+        "status": status_update.status,
+        "current_user": status_update.current_user,
+        "timestamp": get_current_time().isoformat()
+    })
     
     return {"message": "Computer status updated successfully"}
 
 # Student endpoints
-@app.get("/api/student/computers", response_model=List[ComputerResponse])
+@app.get("/api/student/computers")
 def get_computers_student(current_user: User = Depends(get_student_user), db: Session = Depends(get_db)):
-    return db.query(Computer).all()
+    return ORJSONResponse([computer_to_dict(c) for c in db.query(Computer).all()])
 
-@app.get("/api/student/bookings", response_model=List[BookingResponse])
+@app.get("/api/student/bookings")
 def get_student_bookings(current_user: User = Depends(get_student_user), db: Session = Depends(get_db)):
     # Get student record
     student = db.query(Student).filter(Student.user_id == current_user.id).first()
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
     
-    return db.query(Booking).filter(Booking.student_id == student.id).all()
+    bookings = db.query(Booking).filter(Booking.student_id == student.id).all()
+    return ORJSONResponse([booking_to_dict(b) for b in bookings])
 
-@app.get("/api/student/bookings/tomorrow", response_model=List[BookingResponse])
+@app.get("/api/student/bookings/tomorrow")
 def get_student_tomorrow_bookings(current_user: User = Depends(get_student_user), db: Session = Depends(get_db)):
     # Get student record
     student = db.query(Student).filter(Student.user_id == current_user.id).first()
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
     
-    tomorrow_start = get_current_time().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-    tomorrow_end = tomorrow_start + timedelta(days=1)
+    tomorrow_start, tomorrow_end = tomorrow_range()
     
-    return db.query(Booking).filter(
+    bookings = db.query(Booking).filter(
         Booking.student_id == student.id,
         Booking.start_time >= tomorrow_start,
         Booking.start_time < tomorrow_end
     ).order_by(Booking.start_time).all()
+    return ORJSONResponse([booking_to_dict(b) for b in bookings])
+
+# How many of a student's latest bookings the dashboard lists
+DASHBOARD_RECENT_BOOKINGS = 20
 
 @app.get("/api/student/dashboard")
 def get_student_dashboard(current_user: User = Depends(get_student_user), db: Session = Depends(get_db)):
@@ -1009,34 +1152,46 @@ def get_student_dashboard(current_user: User = Depends(get_student_user), db: Se
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
     
-    # Get all bookings
-    all_bookings = db.query(Booking).filter(Booking.student_id == student.id).order_by(Booking.start_time.desc()).all()
+    # Only the most recent bookings are sent; the total comes from COUNT(*)
+    recent_bookings = db.query(Booking).filter(Booking.student_id == student.id).order_by(
+        Booking.start_time.desc()
+    ).limit(DASHBOARD_RECENT_BOOKINGS).all()
+    if len(recent_bookings) < DASHBOARD_RECENT_BOOKINGS:
+        total_bookings = len(recent_bookings)
+    else:
+        total_bookings = db.query(func.count(Booking.id)).filter(Booking.student_id == student.id).scalar()
     
-    # Get tomorrow's bookings
-    tomorrow_start = get_current_time().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-    tomorrow_end = tomorrow_start + timedelta(days=1)
-    tomorrow_bookings = db.query(Booking).filter(
-        Booking.student_id == student.id,
-        Booking.start_time >= tomorrow_start,
-        Booking.start_time < tomorrow_end
-    ).order_by(Booking.start_time).all()
+    # Stored times are naive, so compare against the naive wall-clock bounds (as the SQL filter did)
+    tomorrow_start, tomorrow_end = (bound.replace(tzinfo=None) for bound in tomorrow_range())
+    if total_bookings == len(recent_bookings):
+        # Every booking is already loaded; pick tomorrow's out of them
+        tomorrow_bookings = [
+            b for b in reversed(recent_bookings)
+            if b.start_time is not None and tomorrow_start <= b.start_time < tomorrow_end
+        ]
+    else:
+        tomorrow_bookings = db.query(Booking).filter(
+            Booking.student_id == student.id,
+            Booking.start_time >= tomorrow_start,
+            Booking.start_time < tomorrow_end
+        ).order_by(Booking.start_time).all()
     
     # Get available computers
     computers = db.query(Computer).all()
     
-    return {
+    return ORJSONResponse({
         "student": {
             "id": student.id,
             "name": student.name,
             "email": student.email,
             "student_id": student.student_id
         },
-        "computers": computers,
-        "all_bookings": all_bookings,
-        "tomorrow_bookings": tomorrow_bookings,
+        "computers": [computer_to_dict(c) for c in computers],
+        "recent_bookings": [booking_to_dict(b) for b in recent_bookings],
+        "tomorrow_bookings": [booking_to_dict(b) for b in tomorrow_bookings],
         "has_tomorrow_bookings": len(tomorrow_bookings) > 0,
-        "total_bookings": len(all_bookings)
-    }
+        "total_bookings": total_bookings
+    })
 
 @app.post("/api/student/bookings", response_model=BookingResponse)
 def create_booking_student(booking: StudentBookingCreate, current_user: User = Depends(get_student_user), db: Session = Depends(get_db)):
@@ -1052,18 +1207,12 @@ def create_booking_student(booking: StudentBookingCreate, current_user: User = D
         )
         db.add(student)
         db.commit()
-        db.refresh(student)
     
     # Convert datetime strings to timezone-aware datetime objects
     try:
-        # Handle datetime-local format (YYYY-MM-DDTHH:MM)
-        if 'T' in booking.start_time and len(booking.start_time) == 16:
-            start_time = datetime.strptime(booking.start_time, '%Y-%m-%dT%H:%M')
-            end_time = datetime.strptime(booking.end_time, '%Y-%m-%dT%H:%M')
-        else:
-            # Handle ISO format
-            start_time = datetime.fromisoformat(booking.start_time.replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(booking.end_time.replace('Z', '+00:00'))
+        # The C fromisoformat (Python 3.11+) parses both datetime-local (YYYY-MM-DDTHH:MM) and full ISO with "Z"
+        start_time = datetime.fromisoformat(booking.start_time)
+        end_time = datetime.fromisoformat(booking.end_time)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid datetime format: {str(e)}")
     
@@ -1071,47 +1220,53 @@ def create_booking_student(booking: StudentBookingCreate, current_user: User = D
     start_time_utc = convert_to_utc(start_time)
     end_time_utc = convert_to_utc(end_time)
     
-    # Check if computer is available for the requested time
-    conflicting_bookings = db.query(Booking).filter(
-        Booking.computer_id == booking.computer_id,
-        Booking.status.in_(["scheduled", "active"]),
-        Booking.start_time < end_time_utc,
-        Booking.end_time > start_time_utc
-    ).count()
-    
-    if conflicting_bookings > 0:
-        raise HTTPException(status_code=400, detail="Computer is not available for the requested time slot")
-    
     db_booking = Booking(
         computer_id=booking.computer_id,
         student_id=student.id,
         start_time=start_time_utc,
-        end_time=end_time_utc
+        end_time=end_time_utc,
+        status="scheduled",
+        created_at=get_current_time()
     )
-    db.add(db_booking)
+    # Check availability and insert in one statement, so two requests can't both claim the slot
+    conflict = db.query(Booking.id).filter(
+        Booking.computer_id == booking.computer_id,
+        Booking.status.in_(["scheduled", "active"]),
+        Booking.start_time < end_time_utc,
+        Booking.end_time > start_time_utc
+    ).exists()
+    columns = ["computer_id", "student_id", "start_time", "end_time", "status", "created_at"]
+    values = select(*(literal(getattr(db_booking, c), Booking.__table__.c[c].type) for c in columns)).where(~conflict)
+    db_booking.id = db.execute(
+        insert(Booking).from_select(columns, values).returning(Booking.id)
+    ).scalar()
+    if db_booking.id is None:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Computer is not available for the requested time slot")
     db.commit()
-    db.refresh(db_booking)
     return db_booking
 
 # Public endpoints (no authentication required)
-@app.get("/api/computers", response_model=List[ComputerResponse])
+@app.get("/api/computers")
 def get_computers(db: Session = Depends(get_db)):
-    return db.query(Computer).all()
+    return ORJSONResponse([computer_to_dict(c) for c in db.query(Computer).all()])
 
 @app.get("/api/lab-status")
-def get_lab_status(db: Session = Depends(get_db)):
+def get_lab_status(request: Request, db: Session = Depends(get_db)):
+    now = get_current_time()
     computers = db.query(Computer).all()
     bookings = db.query(Booking).filter(
         Booking.status.in_(["scheduled", "active"]),
-        Booking.start_time <= get_current_time() + timedelta(hours=24),
-        Booking.end_time >= get_current_time()
+        Booking.start_time <= now + timedelta(hours=24),
+        Booking.end_time >= now
     ).all()
     
-    return {
-        "computers": computers,
-        "upcoming_bookings": bookings,
-        "timestamp": get_current_time().isoformat()
+    content = {
+        "computers": [computer_to_dict(c) for c in computers],
+        "upcoming_bookings": [booking_to_dict(b) for b in bookings],
     }
+    # The ETag ignores the timestamp so unchanged lab state revalidates as 304
+    return etag_json_response(request, content, untagged={"timestamp": now.isoformat()})
 
 # WebSocket endpoint for real-time updates
 @app.websocket("/ws")
@@ -1128,12 +1283,19 @@ async def websocket_endpoint(websocket: WebSocket):
 @app.get("/api/test-auth")
 def test_auth(credentials: HTTPBasicCredentials = Depends(security), db: Session = Depends(get_db)):
     try:
-        user = db.query(User).filter(User.username == credentials.username).first()
-        if not user:
-            return {"error": "User not found", "username": credentials.username}
-        
-        if not verify_password(credentials.password, user.hashed_password):
-            return {"error": "Invalid password", "username": credentials.username}
+        # Same short-lived login cache as get_current_user, so polling skips the DB and Argon2
+        cache_key = _auth_cache_key(credentials.username, credentials.password)
+        user = _cached_login(cache_key)
+        if user is None:
+            user = db.query(User).filter(User.username == credentials.username).first()
+            if not user:
+                return {"error": "User not found", "username": credentials.username}
+            
+            if not verify_password(credentials.password, user.hashed_password):
+                return {"error": "Invalid password", "username": credentials.username}
+            # Inactive users are reported here but must not be cached for get_current_user
+            if user.is_active:
+                _remember_login(cache_key, user)
         
         return {"success": True, "user": {"id": user.id, "username": user.username, "role": user.role}}
     except Exception as e:
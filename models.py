@@ -0,0 +1,80 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+Base = declarative_base()
+
+# Timezone setup
+ADDIS_ABABA_TZ = ZoneInfo('Africa/Addis_Ababa')
+
+def get_current_time():
+    """Get current time in Addis Ababa timezone"""
+    return datetime.now(ADDIS_ABABA_TZ)
+
+# Database Models
+class User(Base):
+    __tablename__ = "users"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String, unique=True, index=True)
+    email = Column(String, unique=True, index=True)
+    hashed_password = Column(String)
+    role = Column(String, default="student")  # admin, student
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=lambda: get_current_time())
+
+class Computer(Base):
+    __tablename__ = "computers"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)
+    status = Column(String, default="available")  # available, in_use, maintenance
+    current_user = Column(String, nullable=True)
+    last_updated = Column(DateTime, default=lambda: get_current_time())
+    
+    bookings = relationship("Booking", back_populates="computer")
+
+class Student(Base):
+    __tablename__ = "students"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True)
+    email = Column(String, unique=True, index=True)
+    student_id = Column(String, unique=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # Optional metadata
+    study = Column(String, nullable=True)
+    department = Column(String, nullable=True)
+    registered_at = Column(DateTime, nullable=True)
+    active = Column(Boolean, default=True)
+    # Usage tracking
+    usage_days_total = Column(Integer, nullable=True)
+    usage_days_remaining = Column(Integer, nullable=True)
+    usage_last_decrement_at = Column(DateTime, nullable=True)
+    
+    bookings = relationship("Booking", back_populates="student")
+
+class Booking(Base):
+    __tablename__ = "bookings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    computer_id = Column(Integer, ForeignKey("computers.id"))
+    student_id = Column(Integer, ForeignKey("students.id"))
+    start_time = Column(DateTime)
+    end_time = Column(DateTime)
+    status = Column(String, default="scheduled")  # scheduled, active, completed, cancelled
+    created_at = Column(DateTime, default=lambda: get_current_time())
+    
+    computer = relationship("Computer", back_populates="bookings")
+    student = relationship("Student", back_populates="bookings")
+    
+    # Schedule, toggle and conflict checks filter by student/computer and time window
+    __table_args__ = (
+        Index("ix_bookings_student_start", "student_id", "start_time"),
+        # Covers the availability/conflict checks (computer, status, overlap on start/end)
+        Index("ix_bookings_computer_status_time", "computer_id", "status", "start_time", "end_time"),
+        # Lab status: active/scheduled bookings in a time window
+        Index("ix_bookings_status_start", "status", "start_time"),
+    )
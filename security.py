@@ -0,0 +1,32 @@
+import hashlib
+import hmac
+import string
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+# Argon2id with the OWASP-recommended parameters (46 MiB, 3 passes, 1 lane)
+_password_hasher = PasswordHasher(memory_cost=47104, time_cost=3, parallelism=1)
+
+def _is_legacy_hash(hashed_password: str) -> bool:
+    """Accounts created before Argon2 store a bare SHA-256 hex digest"""
+    return len(hashed_password) == 64 and all(c in string.hexdigits for c in hashed_password)
+
+def hash_password(password: str) -> str:
+    """Hash a password using Argon2id (salt and parameters are embedded in the hash)"""
+    return _password_hasher.hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash in constant time"""
+    if not hashed_password:
+        return False
+    if _is_legacy_hash(hashed_password):
+        legacy = hashlib.sha256(plain_password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, hashed_password)
+    try:
+        return _password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True for legacy SHA-256 hashes or Argon2 hashes made with outdated parameters"""
+    return _is_legacy_hash(hashed_password) or _password_hasher.check_needs_rehash(hashed_password)
@@ -16,6 +16,8 @@ function initializeWebSocket() {
   const wsUrl = `${protocol}//${window.location.host}/ws`;
 
   websocket = new WebSocket(wsUrl);
+  // Broadcasts arrive as binary frames of UTF-8 JSON
+  websocket.binaryType = "arraybuffer";
 
   websocket.onopen = function (event) {
     console.log("WebSocket connected");
@@ -24,7 +26,11 @@ function initializeWebSocket() {
 
   websocket.onmessage = function (event) {
     try {
-      const data = JSON.parse(event.data);
+      const raw =
+        typeof event.data === "string"
+          ? event.data
+          : new TextDecoder().decode(event.data);
+      const data = JSON.parse(raw);
       handleWebSocketMessage(data);
     } catch (e) {
       console.log("Received message:", event.data);
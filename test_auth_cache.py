@@ -0,0 +1,115 @@
+from fastapi import HTTPException
+from fastapi.security import HTTPBasicCredentials
+from sqlalchemy.orm import Session
+
+import main
+from main import (
+    SessionLocal, User, Student, get_current_user, hash_password, invalidate_auth_cache,
+    toggle_student_active, delete_user_admin, delete_student_admin,
+)
+
+PASSWORD = "cache-secret"
+
+
+def ensure_admin(db: Session) -> User:
+    admin = db.query(User).filter(User.username == "test_admin").first()
+    if admin:
+        return admin
+    admin = User(username="test_admin", email="test_admin@example.com",
+                 hashed_password=hash_password("password"), role="admin", is_active=True)
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+
+def cleanup(db: Session, username: str) -> None:
+    for s in db.query(Student).filter(Student.student_id == username).all():
+        db.delete(s)
+    for u in db.query(User).filter(User.username == username).all():
+        db.delete(u)
+    db.commit()
+    # The admin handlers bulk-delete, so drop rows the session still holds before ids get reused
+    db.expunge_all()
+
+
+def create_student_user(db: Session, username: str) -> Student:
+    user = User(username=username, email=f"{username}@example.com",
+                hashed_password=hash_password(PASSWORD), role="student", is_active=True)
+    db.add(user)
+    db.commit()
+    student = Student(name=username, email=f"{username}@example.com", student_id=username,
+                      study="Test", department="Test", user_id=user.id, active=True)
+    db.add(student)
+    db.commit()
+    return student
+
+
+def login(db: Session, username: str, password: str = PASSWORD) -> User:
+    return get_current_user(HTTPBasicCredentials(username=username, password=password), db=db)
+
+
+def login_rejected(db: Session, username: str, password: str = PASSWORD) -> bool:
+    # 401 for unknown users or wrong passwords, 400 for inactive ones
+    try:
+        login(db, username, password)
+    except HTTPException as he:
+        return he.status_code in (400, 401)
+    return False
+
+
+def run_tests():
+    db = SessionLocal()
+    username = "auth_cache_test"
+    try:
+        admin = ensure_admin(db)
+        cleanup(db, username)
+        invalidate_auth_cache()
+
+        # Deactivating the linked user drops the cached login
+        student = create_student_user(db, username)
+        assert login(db, username).username == username
+        assert main._auth_cache, "Successful login should be cached"
+        result = toggle_student_active(student.id, current_user=admin, db=db)
+        assert result["is_active"] is False
+        assert login_rejected(db, username), "Cached login must be rejected after deactivation"
+
+        # test_auth reports inactive users but does not cache them
+        invalidate_auth_cache()
+        # Called through the module so pytest does not collect the endpoint as a test
+        response = main.test_auth(HTTPBasicCredentials(username=username, password=PASSWORD), db=db)
+        assert response.get("success"), response
+        assert not main._auth_cache, "test_auth must not cache an inactive user"
+        assert login_rejected(db, username), "Inactive user must not log in after test_auth"
+        cleanup(db, username)
+
+        # Deleting the user drops the cached login
+        student = create_student_user(db, username)
+        assert login(db, username).username == username
+        delete_user_admin(student.user_id, current_user=admin, db=db)
+        assert login_rejected(db, username), "Cached login must be rejected after delete_user_admin"
+        cleanup(db, username)
+
+        # Deleting the student (and its linked user) drops the cached login
+        student = create_student_user(db, username)
+        assert login(db, username).username == username
+        delete_student_admin(student.id, current_user=admin, db=db)
+        assert login_rejected(db, username), "Cached login must be rejected after delete_student_admin"
+        cleanup(db, username)
+
+        # A wrong password is checked against the DB even while the right one is cached
+        create_student_user(db, username)
+        invalidate_auth_cache()
+        assert login(db, username).username == username
+        cached_keys = set(main._auth_cache)
+        assert login_rejected(db, username, "wrong"), "Wrong password must not log in from the cache"
+        assert set(main._auth_cache) == cached_keys, "Wrong password must not be cached"
+        print("OK: cached logins are dropped on deactivate/delete, wrong passwords and inactive users are never cached")
+    finally:
+        cleanup(db, username)
+        invalidate_auth_cache()
+        db.close()
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from main import (
+    SessionLocal, User, Student, Computer, Booking, BookingResponse, StudentBookingCreate,
+    create_booking_student, get_current_time, hash_password,
+)
+
+
+def cleanup(db: Session, username: str, computer_name: str) -> None:
+    computer_ids = db.query(Computer.id).filter(Computer.name == computer_name).scalar_subquery()
+    db.query(Booking).filter(Booking.computer_id.in_(computer_ids)).delete(synchronize_session=False)
+    db.query(Computer).filter(Computer.name == computer_name).delete(synchronize_session=False)
+    db.query(Student).filter(Student.student_id == username).delete(synchronize_session=False)
+    db.query(User).filter(User.username == username).delete(synchronize_session=False)
+    db.commit()
+    db.expunge_all()
+
+
+def book(db: Session, user: User, computer_id: int, start, end):
+    payload = StudentBookingCreate(computer_id=computer_id, start_time=start.isoformat(), end_time=end.isoformat())
+    return create_booking_student(payload, current_user=user, db=db)
+
+
+def run_tests():
+    db = SessionLocal()
+    username = "booking_create_test"
+    computer_name = "Booking Test PC"
+    try:
+        cleanup(db, username, computer_name)
+        user = User(username=username, email=f"{username}@example.com",
+                    hashed_password=hash_password("password"), role="student", is_active=True)
+        computer = Computer(name=computer_name, status="available")
+        db.add_all([user, computer])
+        db.commit()
+        student = Student(name=username, email=f"{username}@example.com", student_id=username,
+                          study="Test", department="Test", user_id=user.id, active=True)
+        db.add(student)
+        db.commit()
+
+        # A slot well clear of anything else on this computer
+        start = (get_current_time() + timedelta(days=30)).replace(hour=10, minute=0, second=0, microsecond=0)
+        end = start + timedelta(hours=2)
+
+        # The INSERT ... SELECT ... RETURNING path hands back the new row's id with every field set
+        booking = BookingResponse.model_validate(book(db, user, computer.id, start, end))
+        stored = db.query(Booking).filter(Booking.id == booking.id).one()
+        assert booking.computer_id == computer.id
+        assert booking.student_id == student.id
+        assert booking.status == "scheduled"
+        assert booking.start_time == start and booking.end_time == end
+        assert stored.student_id == student.id and stored.status == "scheduled"
+
+        # An overlapping request is refused without inserting anything
+        try:
+            book(db, user, computer.id, start + timedelta(hours=1), end + timedelta(hours=1))
+            raise AssertionError("Overlapping booking should be rejected")
+        except HTTPException as he:
+            assert he.status_code == 400, f"Expected 400, got {he.status_code}"
+        assert db.query(Booking).filter(Booking.computer_id == computer.id).count() == 1
+
+        # A slot starting exactly when the first ends does not conflict
+        follow_up = book(db, user, computer.id, end, end + timedelta(hours=1))
+        assert follow_up.id is not None and follow_up.id != booking.id
+        assert db.query(Booking).filter(Booking.computer_id == computer.id).count() == 2
+        print("OK: bookings insert with their id and fields, overlaps are rejected with 400")
+    finally:
+        cleanup(db, username, computer_name)
+        db.close()
+
+
+if __name__ == "__main__":
+    run_tests()
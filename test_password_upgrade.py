@@ -0,0 +1,63 @@
+import hashlib
+
+from fastapi import HTTPException
+from fastapi.security import HTTPBasicCredentials
+from sqlalchemy.orm import Session
+
+from main import SessionLocal, User, get_current_user, invalidate_auth_cache
+from security import verify_password
+
+
+def cleanup_user(db: Session, username: str) -> None:
+    for u in db.query(User).filter(User.username == username).all():
+        db.delete(u)
+    db.commit()
+
+
+def login_fails(db: Session, username: str, password: str) -> bool:
+    try:
+        get_current_user(HTTPBasicCredentials(username=username, password=password), db=db)
+    except HTTPException as he:
+        return he.status_code == 401
+    return False
+
+
+def run_tests():
+    db = SessionLocal()
+    username = "legacy_hash_test"
+    try:
+        cleanup_user(db, username)
+        invalidate_auth_cache()
+
+        # Accounts created before Argon2 store a bare SHA-256 hex digest
+        legacy_hash = hashlib.sha256(b"legacy-secret").hexdigest()
+        db.add(User(username=username, email="legacy_hash_test@example.com",
+                    hashed_password=legacy_hash, role="admin", is_active=True))
+        db.commit()
+
+        assert verify_password("legacy-secret", legacy_hash), "Legacy SHA-256 hash should verify"
+        assert not verify_password("wrong", legacy_hash), "Wrong password must fail against a legacy hash"
+        assert login_fails(db, username, "wrong"), "Wrong password must not log in a legacy account"
+
+        user = get_current_user(HTTPBasicCredentials(username=username, password="legacy-secret"), db=db)
+        assert user.username == username
+
+        # The successful login rewrote the stored hash as Argon2id
+        db.expire_all()
+        stored = db.query(User.hashed_password).filter(User.username == username).scalar()
+        assert stored.startswith("$argon2id$"), f"Expected upgraded Argon2id hash, got {stored[:16]}"
+        assert verify_password("legacy-secret", stored), "Upgraded hash should verify"
+        assert not verify_password("wrong", stored), "Wrong password must fail against an Argon2 hash"
+
+        # Bypass the login cache so the wrong password reaches the Argon2 verify
+        invalidate_auth_cache()
+        assert login_fails(db, username, "wrong"), "Wrong password must not log in an upgraded account"
+        print("OK: legacy SHA-256 hashes authenticate, upgrade to Argon2id, and wrong passwords fail")
+    finally:
+        cleanup_user(db, username)
+        invalidate_auth_cache()
+        db.close()
+
+
+if __name__ == "__main__":
+    run_tests()